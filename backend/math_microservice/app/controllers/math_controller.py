@@ -1,13 +1,13 @@
-import json
 import time
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import AsyncGenerator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func, desc, case, and_
 
-from ..db.database import get_db
+from ..db.database import AsyncSessionLocal, get_db
 from ..models.request_model import MathRequest, CacheEntry
 from ..schemas.math_schemas import (
     PowerRequest, PowerResponse,
@@ -17,12 +17,15 @@ from ..schemas.math_schemas import (
     HealthResponse, CacheEntryInfo
 )
 from ..services.math_service import MathService
+from ..services.request_log_writer import RequestLogWriter
 from ..utils.logger import get_logger, log_request_info
+from ..utils.serialization import CachedJSONBody, pack, unpack
 
 # Initialize router and services
 router = APIRouter()
 math_service = MathService()
-logger = get_logger(__name__)
+request_log_writer = RequestLogWriter()
+logger = get_logger(__name__, component="math_controller")
 
 
 def get_client_ip(request: Request) -> str:
@@ -34,7 +37,6 @@ def get_client_ip(request: Request) -> str:
 
 
 async def log_and_persist_request(
-    db: AsyncSession,
     request: Request,
     operation: str,
     parameters: dict,
@@ -42,9 +44,9 @@ async def log_and_persist_request(
     execution_time_ms: float = None,
     success: bool = True,
     error_message: str = None
-) -> MathRequest:
+) -> None:
     """
-    Log and persist request information to database.
+    Log request information and queue it for persistence.
     """
     client_ip = get_client_ip(request)
     user_agent = request.headers.get("User-Agent", "")
@@ -60,41 +62,71 @@ async def log_and_persist_request(
         client_ip=client_ip
     )
 
-    # Persist to database
-    try:
-        db_request = MathRequest(
-            operation=operation,
-            parameters=json.dumps(parameters),
-            result=json.dumps(result) if result is not None else None,
-            execution_time_ms=execution_time_ms,
-            success=success,
-            error_message=error_message,
-            client_ip=client_ip,
-            user_agent=user_agent
-        )
+    # Persisted in batches by the background writer
+    await request_log_writer.enqueue({
+        "operation": operation,
+        "parameters": pack(parameters),
+        "result": pack(result) if result is not None else None,
+        "execution_time_ms": execution_time_ms,
+        "success": success,
+        "error_message": error_message,
+        "client_ip": client_ip,
+        "user_agent": user_agent,
+        "timestamp": datetime.utcnow()
+    })
+
+
+def to_request_history(req: MathRequest) -> MathRequestHistory:
+    """Convert a persisted request into its response schema."""
+    return MathRequestHistory(
+        id=req.id,
+        operation=req.operation,
+        parameters=unpack(req.parameters),
+        result=unpack(req.result) if req.result is not None else None,
+        execution_time_ms=req.execution_time_ms,
+        success=req.success,
+        error_message=req.error_message,
+        timestamp=req.timestamp,
+        client_ip=req.client_ip
+    )
 
-        db.add(db_request)
-        await db.commit()
-        await db.refresh(db_request)
 
-        return db_request
+async def stream_request_history(query) -> AsyncGenerator[str, None]:
+    """
+    Yield history records as NDJSON lines, fetching rows in batches.
 
+    Uses its own session since the response body is sent after the
+    request-scoped session has been released.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = await db.stream_scalars(query.execution_options(yield_per=100))
+            async for req in rows:
+                yield to_request_history(req).model_dump_json() + "\n"
     except Exception as e:
-        logger.error("Failed to persist request", error=str(e))
-        await db.rollback()
+        logger.error("Failed to stream request history", error=str(e))
         raise
 
 
+health_body = CachedJSONBody(lambda: {
+    "status": "healthy",
+    "timestamp": datetime.utcnow().isoformat(),
+    "version": "1.0.0"
+})
+
+operations_body = CachedJSONBody(lambda: {
+    "operations": math_service.get_available_operations(),
+    "total": len(math_service.operations),
+    "timestamp": datetime.utcnow().isoformat()
+})
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
     Health check endpoint.
     """
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.utcnow(),
-        version="1.0.0"
-    )
+    return Response(content=health_body.get(), media_type="application/json")
 
 
 @router.get("/operations")
@@ -102,18 +134,14 @@ async def get_available_operations():
     """
     Get list of available mathematical operations.
     """
-    operations = math_service.get_available_operations()
-    return {
-        "operations": operations,
-        "total": len(operations),
-        "timestamp": datetime.utcnow()
-    }
+    return Response(content=operations_body.get(), media_type="application/json")
 
 
 @router.post("/math/power", response_model=PowerResponse)
 async def calculate_power(
     request_data: PowerRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -131,9 +159,10 @@ async def calculate_power(
             db, operation, parameters
         )
 
-        # Log and persist request
-        await log_and_persist_request(
-            db, request, operation, parameters, result, execution_time_ms, True
+        # Log and persist request once the response has been sent
+        background_tasks.add_task(
+            log_and_persist_request,
+            request, operation, parameters, result, execution_time_ms, True
         )
 
         return PowerResponse(
@@ -150,7 +179,7 @@ async def calculate_power(
         execution_time_ms = (time.perf_counter() - start_time) * 1000
 
         await log_and_persist_request(
-            db, request, operation, parameters, None, execution_time_ms, False, error_msg
+            request, operation, parameters, None, execution_time_ms, False, error_msg
         )
 
         raise HTTPException(status_code=400, detail=error_msg)
@@ -160,7 +189,7 @@ async def calculate_power(
         execution_time_ms = (time.perf_counter() - start_time) * 1000
 
         await log_and_persist_request(
-            db, request, operation, parameters, None, execution_time_ms, False, error_msg
+            request, operation, parameters, None, execution_time_ms, False, error_msg
         )
 
         logger.error("Unexpected error in power calculation", error=str(e))
@@ -171,6 +200,7 @@ async def calculate_power(
 async def calculate_fibonacci(
     request_data: FibonacciRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -187,8 +217,9 @@ async def calculate_fibonacci(
             db, operation, parameters
         )
 
-        await log_and_persist_request(
-            db, request, operation, parameters, result, execution_time_ms, True
+        background_tasks.add_task(
+            log_and_persist_request,
+            request, operation, parameters, result, execution_time_ms, True
         )
 
         return FibonacciResponse(
@@ -205,7 +236,7 @@ async def calculate_fibonacci(
         execution_time_ms = (time.perf_counter() - start_time) * 1000
 
         await log_and_persist_request(
-            db, request, operation, parameters, None, execution_time_ms, False, error_msg
+            request, operation, parameters, None, execution_time_ms, False, error_msg
         )
 
         raise HTTPException(status_code=400, detail=error_msg)
@@ -215,7 +246,7 @@ async def calculate_fibonacci(
         execution_time_ms = (time.perf_counter() - start_time) * 1000
 
         await log_and_persist_request(
-            db, request, operation, parameters, None, execution_time_ms, False, error_msg
+            request, operation, parameters, None, execution_time_ms, False, error_msg
         )
 
         logger.error("Unexpected error in fibonacci calculation", error=str(e))
@@ -226,6 +257,7 @@ async def calculate_fibonacci(
 async def calculate_factorial(
     request_data: FactorialRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -242,8 +274,9 @@ async def calculate_factorial(
             db, operation, parameters
         )
 
-        await log_and_persist_request(
-            db, request, operation, parameters, result, execution_time_ms, True
+        background_tasks.add_task(
+            log_and_persist_request,
+            request, operation, parameters, result, execution_time_ms, True
         )
 
         return FactorialResponse(
@@ -260,7 +293,7 @@ async def calculate_factorial(
         execution_time_ms = (time.perf_counter() - start_time) * 1000
 
         await log_and_persist_request(
-            db, request, operation, parameters, None, execution_time_ms, False, error_msg
+            request, operation, parameters, None, execution_time_ms, False, error_msg
         )
 
         raise HTTPException(status_code=400, detail=error_msg)
@@ -270,7 +303,7 @@ async def calculate_factorial(
         execution_time_ms = (time.perf_counter() - start_time) * 1000
 
         await log_and_persist_request(
-            db, request, operation, parameters, None, execution_time_ms, False, error_msg
+            request, operation, parameters, None, execution_time_ms, False, error_msg
         )
 
         logger.error("Unexpected error in factorial calculation", error=str(e))
@@ -282,6 +315,7 @@ async def get_request_history(
     limit: int = Query(default=50, le=1000, description="Number of records to return"),
     operation: Optional[str] = Query(default=None, description="Filter by operation type"),
     success_only: bool = Query(default=False, description="Show only successful requests"),
+    stream: bool = Query(default=False, description="Stream records as newline-delimited JSON"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -298,25 +332,16 @@ async def get_request_history(
 
         query = query.limit(limit)
 
+        if stream:
+            return StreamingResponse(
+                stream_request_history(query),
+                media_type="application/x-ndjson"
+            )
+
         result = await db.execute(query)
-        requests = result.scalars().all()
 
         # Convert to response format
-        history = []
-        for req in requests:
-            history.append(MathRequestHistory(
-                id=req.id,
-                operation=req.operation,
-                parameters=json.loads(req.parameters),
-                result=json.loads(req.result) if req.result else None,
-                execution_time_ms=req.execution_time_ms,
-                success=req.success,
-                error_message=req.error_message,
-                timestamp=req.timestamp,
-                client_ip=req.client_ip
-            ))
-
-        return history
+        return [to_request_history(req) for req in result.scalars()]
 
     except Exception as e:
         logger.error("Failed to retrieve request history", error=str(e))
@@ -329,27 +354,26 @@ async def get_service_statistics(db: AsyncSession = Depends(get_db)):
     Get service usage statistics.
     """
     try:
-        # Total requests
-        total_result = await db.execute(select(func.count(MathRequest.id)))
-        total_requests = total_result.scalar() or 0
-
-        # Successful requests
-        success_result = await db.execute(
-            select(func.count(MathRequest.id)).where(MathRequest.success == True)
+        # Totals, average execution time and cached count in a single pass
+        totals_result = await db.execute(
+            select(
+                func.count(MathRequest.id),
+                func.sum(case((MathRequest.success == True, 1), else_=0)),
+                func.avg(case((MathRequest.success == True, MathRequest.execution_time_ms))),
+                func.sum(case(
+                    (and_(MathRequest.success == True, MathRequest.execution_time_ms == 0), 1),
+                    else_=0
+                ))
+            )
         )
-        successful_requests = success_result.scalar() or 0
+        total_requests, successful_requests, avg_execution_time, cached_requests = totals_result.one()
+        total_requests = total_requests or 0
+        successful_requests = successful_requests or 0
+        avg_execution_time = avg_execution_time or 0.0
+        cached_requests = cached_requests or 0
 
         failed_requests = total_requests - successful_requests
 
-        # Average execution time
-        avg_time_result = await db.execute(
-            select(func.avg(MathRequest.execution_time_ms)).where(
-                MathRequest.success == True,
-                MathRequest.execution_time_ms.isnot(None)
-            )
-        )
-        avg_execution_time = avg_time_result.scalar() or 0.0
-
         # Operations count
         ops_result = await db.execute(
             select(MathRequest.operation, func.count(MathRequest.id))
@@ -358,13 +382,6 @@ async def get_service_statistics(db: AsyncSession = Depends(get_db)):
         operations_count = dict(ops_result.all())
 
         # Simple cache hit rate calculation (cached operations have 0 execution time)
-        cached_result = await db.execute(
-            select(func.count(MathRequest.id)).where(
-                MathRequest.execution_time_ms == 0,
-                MathRequest.success == True
-            )
-        )
-        cached_requests = cached_result.scalar() or 0
         cache_hit_rate = (cached_requests / successful_requests * 100) if successful_requests > 0 else 0.0
 
         # Cache entries by operation
@@ -415,10 +432,10 @@ async def get_cache_entries(
             entries.append(CacheEntryInfo(
                 id=entry.id,
                 operation=entry.operation,
-                parameters=json.loads(entry.parameters),
-                result=json.loads(entry.result),
+                parameters=unpack(entry.parameters),
+                result=unpack(entry.result),
                 created_at=entry.created_at,
-                expires_at=entry.expires_at,
+                expires_at=datetime.fromtimestamp(entry.expires_at, timezone.utc) if entry.expires_at is not None else None,
                 hit_count=entry.hit_count
             ))
 
@@ -2,18 +2,50 @@ import os
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event, text
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./math_service.db")
 
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_MEMORY_DB = IS_SQLITE and (":memory:" in DATABASE_URL or DATABASE_URL.endswith("://"))
+
+# Keep a pool of long-lived connections so SQLite's page cache stays warm
+# across requests instead of being rebuilt on every connect.
+pool_options = {} if IS_MEMORY_DB else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+    "pool_recycle": 3600,
+    # SQLite connections are local file handles and cannot go stale
+    "pool_pre_ping": not IS_SQLITE,
+}
+
 # Create async engine
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True if os.getenv("DEBUG", "false").lower() == "true" else False,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **pool_options
+)
+
+# WAL lets readers run alongside the writer and, with synchronous=NORMAL,
+# replaces the per-commit rollback-journal fsync with periodic checkpoints.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
 )
 
+if IS_SQLITE:
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -40,10 +72,53 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# cache_entries.expires_at used to hold naive UTC datetime text; it now holds
+# Unix seconds. SQLite's column affinity takes the integers in place.
+CONVERT_LEGACY_EXPIRES_AT = (
+    "UPDATE cache_entries "
+    "SET expires_at = CAST(strftime('%s', expires_at) AS INTEGER) "
+    "WHERE typeof(expires_at) = 'text'"
+)
+
+# PostgreSQL keeps the declared type, so a legacy timestamp column has to be
+# retyped rather than rewritten; naive values are read as UTC. Other
+# dialects need the equivalent migration applied by hand.
+POSTGRES_LEGACY_EXPIRES_AT_TYPE = (
+    "SELECT data_type FROM information_schema.columns "
+    "WHERE table_schema = current_schema() "
+    "AND table_name = 'cache_entries' AND column_name = 'expires_at'"
+)
+POSTGRES_CONVERT_LEGACY_EXPIRES_AT = (
+    "ALTER TABLE cache_entries ALTER COLUMN expires_at TYPE BIGINT "
+    "USING CAST(extract(epoch FROM expires_at) AS BIGINT)"
+)
+
+
+def _create_schema(sync_conn) -> None:
+    # IF NOT EXISTS rather than create_all's inspect-then-create, so workers
+    # starting together cannot race between the check and the CREATE. Indexes
+    # are emitted separately so tables that predate them still get them.
+    for table in Base.metadata.sorted_tables:
+        sync_conn.execute(CreateTable(table, if_not_exists=True))
+        for index in table.indexes:
+            sync_conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 async def init_db() -> None:
 
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_schema)
+        if IS_SQLITE:
+            await conn.exec_driver_sql(CONVERT_LEGACY_EXPIRES_AT)
+        elif conn.dialect.name == "postgresql":
+            # Held until commit, so a worker waiting here re-reads the type
+            # after another one has already converted the column
+            await conn.exec_driver_sql(
+                "LOCK TABLE cache_entries IN ACCESS EXCLUSIVE MODE"
+            )
+            data_type = await conn.scalar(text(POSTGRES_LEGACY_EXPIRES_AT_TYPE))
+            if data_type and data_type.startswith("timestamp"):
+                await conn.exec_driver_sql(POSTGRES_CONVERT_LEGACY_EXPIRES_AT)
 
 
 async def close_db() -> None:
@@ -2,18 +2,22 @@ import os
 from contextlib import asynccontextmanager
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
-from .controllers.math_controller import router as math_router
+from .controllers.math_controller import math_service, request_log_writer, router as math_router
 from .db.database import init_db, close_db
 from .utils.logger import configure_logging, get_logger
+from .utils.middleware import RequestLoggingMiddleware
+from .utils.serialization import CachedJSONBody, FastJSONResponse
 
 # Configure logging
 configure_logging()
 logger = get_logger(__name__)
 
+# Probe and documentation traffic that is not worth logging
+UNLOGGED_PATHS = frozenset({"/", "/health", "/operations", "/docs", "/openapi.json"})
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -26,11 +30,16 @@ async def lifespan(app: FastAPI):
         await init_db()
         logger.info("Database initialized successfully")
 
+        # Start batching request logs to the database
+        request_log_writer.start()
+
         yield
 
     finally:
         # Shutdown
         logger.info("Shutting down Math Microservice")
+        await request_log_writer.stop()
+        await math_service.wait_for_background_tasks()
         await close_db()
         logger.info("Database connections closed")
 
@@ -83,55 +92,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """
-    Add processing time header to all responses.
-    """
-    import time
-    start_time = time.time()
-
-    response = await call_next(request)
-
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-
-    return response
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """
-    Log all incoming requests.
-    """
-    start_time = datetime.utcnow()
-
-    # Log request
-    logger.info(
-        "Incoming request",
-        method=request.method,
-        url=str(request.url),
-        client_ip=request.client.host if request.client else "unknown",
-        user_agent=request.headers.get("User-Agent", ""),
-        timestamp=start_time.isoformat()
-    )
-
-    response = await call_next(request)
-
-    # Log response
-    end_time = datetime.utcnow()
-    duration = (end_time - start_time).total_seconds() * 1000
-
-    logger.info(
-        "Request completed",
-        method=request.method,
-        url=str(request.url),
-        status_code=response.status_code,
-        duration_ms=round(duration, 2)
-    )
-
-    return response
+# Time, log and tag every request with X-Process-Time
+app.add_middleware(RequestLoggingMiddleware, unlogged_paths=UNLOGGED_PATHS)
 
 
 @app.exception_handler(404)
@@ -139,7 +101,7 @@ async def not_found_handler(request: Request, exc: HTTPException):
     """
     Custom 404 handler.
     """
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=404,
         content={
             "error": "Not Found",
@@ -164,7 +126,7 @@ async def validation_exception_handler(request: Request, exc):
     """
     Custom validation error handler.
     """
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=422,
         content={
             "error": "Validation Error",
@@ -187,7 +149,7 @@ async def internal_server_error_handler(request: Request, exc: Exception):
         method=request.method
     )
 
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
@@ -201,46 +163,55 @@ async def internal_server_error_handler(request: Request, exc: Exception):
 app.include_router(math_router, tags=["Mathematical Operations"])
 
 
+root_body = CachedJSONBody(lambda: {
+    "service": "Math Microservice",
+    "version": "1.0.0",
+    "description": "Production-ready API for mathematical operations",
+    "endpoints": {
+        "documentation": "/docs",
+        "health": "/health",
+        "operations": "/operations",
+        "power": "/math/power",
+        "fibonacci": "/math/fibonacci",
+        "factorial": "/math/factorial",
+        "history": "/history",
+        "statistics": "/stats",
+        "cache": "/cache"
+    },
+    "features": [
+        "Request persistence",
+        "Result caching",
+        "Comprehensive logging",
+        "Error handling",
+        "Input validation",
+        "Performance monitoring"
+    ],
+    "timestamp": datetime.utcnow().isoformat()
+})
+
+
 @app.get("/")
 async def root():
     """
     Root endpoint with API information.
     """
-    return {
-        "service": "Math Microservice",
-        "version": "1.0.0",
-        "description": "Production-ready API for mathematical operations",
-        "endpoints": {
-            "documentation": "/docs",
-            "health": "/health",
-            "operations": "/operations",
-            "power": "/math/power",
-            "fibonacci": "/math/fibonacci",
-            "factorial": "/math/factorial",
-            "history": "/history",
-            "statistics": "/stats",
-            "cache": "/cache"
-        },
-        "features": [
-            "Request persistence",
-            "Result caching",
-            "Comprehensive logging",
-            "Error handling",
-            "Input validation",
-            "Performance monitoring"
-        ],
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return Response(content=root_body.get(), media_type="application/json")
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    # Development server
+    reload = os.getenv("RELOAD", "false").lower() == "true"
+
+    # loop/http "auto" resolve to uvloop and httptools, installed with
+    # uvicorn[standard], and fall back to asyncio/h11 where unavailable
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        loop="auto",
+        http="auto",
+        workers=None if reload else int(os.getenv("WORKERS", os.cpu_count() or 1)),
+        reload=reload,
         log_level="info"
-    )
\ No newline at end of file
+    )
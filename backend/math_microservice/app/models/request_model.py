@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean
+from sqlalchemy import BigInteger, Column, Integer, String, Float, DateTime, Text, Boolean, Index, LargeBinary
 from sqlalchemy.sql import func
 
 from ..db.database import Base
@@ -8,11 +8,18 @@ from ..db.database import Base
 class MathRequest(Base):
 
     __tablename__ = "math_requests"
+    __table_args__ = (
+        # /history filters by operation or success and orders by timestamp
+        Index("ix_math_requests_operation_timestamp", "operation", "timestamp"),
+        Index("ix_math_requests_success_timestamp", "success", "timestamp"),
+        # /stats groups by operation and filters by success
+        Index("ix_math_requests_operation_success", "operation", "success"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    operation = Column(String(50), nullable=False, index=True)
-    parameters = Column(Text, nullable=False)  # JSON string of parameters
-    result = Column(Text, nullable=True)  # JSON string of result
+    operation = Column(String(50), nullable=False)
+    parameters = Column(LargeBinary, nullable=False)  # MessagePack-encoded parameters
+    result = Column(LargeBinary, nullable=True)  # MessagePack-encoded result
     execution_time_ms = Column(Float, nullable=True)
     success = Column(Boolean, default=True, nullable=False)
     error_message = Column(Text, nullable=True)
@@ -27,14 +34,18 @@ class MathRequest(Base):
 class CacheEntry(Base):
 
     __tablename__ = "cache_entries"
+    __table_args__ = (
+        # /cache filters by operation and orders by created_at
+        Index("ix_cache_entries_operation_created_at", "operation", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    operation = Column(String(50), nullable=False, index=True)  # Operation name (fibonacci, power, etc.)
-    parameters = Column(Text, nullable=False)  # JSON string of parameters for easy reading
+    operation = Column(String(50), nullable=False)  # Operation name (fibonacci, power, etc.)
+    parameters = Column(LargeBinary, nullable=False)  # MessagePack-encoded parameters
     cache_key = Column(String(255), unique=True, nullable=False, index=True)
-    result = Column(Text, nullable=False)  # JSON string of cached result
+    result = Column(LargeBinary, nullable=False)  # MessagePack-encoded cached result
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    expires_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(BigInteger, nullable=True)  # Unix timestamp (UTC seconds)
     hit_count = Column(Integer, default=0, nullable=False)
 
     def __repr__(self) -> str:
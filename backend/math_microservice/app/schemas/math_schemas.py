@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional, Union, Any
-from pydantic import BaseModel, Field, validator
+from typing import Optional, Union, Any, Literal
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class HealthResponse(BaseModel):
@@ -12,7 +12,7 @@ class HealthResponse(BaseModel):
 
 class MathOperationRequest(BaseModel):
     """Base schema for mathematical operation requests."""
-    pass
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
 
 class PowerRequest(MathOperationRequest):
@@ -20,38 +20,16 @@ class PowerRequest(MathOperationRequest):
     base: Union[int, float] = Field(..., description="The base number")
     exponent: Union[int, float] = Field(..., description="The exponent")
 
-    @validator('base', 'exponent')
-    def validate_numbers(cls, v):
-        if not isinstance(v, (int, float)):
-            raise ValueError('Must be a number')
-        return v
-
 
 class FibonacciRequest(MathOperationRequest):
     """Schema for Fibonacci operation request."""
     n: int = Field(..., ge=0, le=1000, description="The position in Fibonacci sequence (0-1000)")
 
-    @validator('n')
-    def validate_fibonacci_input(cls, v):
-        if v < 0:
-            raise ValueError('Fibonacci position must be non-negative')
-        if v > 1000:
-            raise ValueError('Fibonacci position must not exceed 1000 for performance reasons')
-        return v
-
 
 class FactorialRequest(MathOperationRequest):
     """Schema for factorial operation request."""
     n: int = Field(..., ge=0, le=170, description="The number to calculate factorial (0-170)")
 
-    @validator('n')
-    def validate_factorial_input(cls, v):
-        if v < 0:
-            raise ValueError('Factorial input must be non-negative')
-        if v > 170:
-            raise ValueError('Factorial input must not exceed 170 to prevent overflow')
-        return v
-
 
 class MathOperationResponse(BaseModel):
     """Base schema for mathematical operation responses."""
@@ -65,17 +43,17 @@ class MathOperationResponse(BaseModel):
 
 class PowerResponse(MathOperationResponse):
     """Schema for power operation response."""
-    operation: str = "power"
+    operation: Literal["power"] = "power"
 
 
 class FibonacciResponse(MathOperationResponse):
     """Schema for Fibonacci operation response."""
-    operation: str = "fibonacci"
+    operation: Literal["fibonacci"] = "fibonacci"
 
 
 class FactorialResponse(MathOperationResponse):
     """Schema for factorial operation response."""
-    operation: str = "factorial"
+    operation: Literal["factorial"] = "factorial"
 
 
 class ErrorResponse(BaseModel):
@@ -98,8 +76,7 @@ class MathRequestHistory(BaseModel):
     timestamp: datetime
     client_ip: Optional[str]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class StatsResponse(BaseModel):
@@ -123,5 +100,4 @@ class CacheEntryInfo(BaseModel):
     expires_at: Optional[datetime]
     hit_count: int
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
@@ -1,21 +1,129 @@
+import asyncio
 import hashlib
-import json
+import logging
+import math
+import struct
 import time
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Union
+from functools import cached_property
+from typing import Any, Coroutine, Dict, Optional, Set, Union
 
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import bindparam, insert, text, update
 
+from ..db.database import AsyncSessionLocal
 from ..models.request_model import CacheEntry
 from ..utils.logger import LoggerMixin
+from ..utils.lru import LRUCache
+from ..utils.serialization import pack, unpack
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; cache keys then use BLAKE2b
+    xxhash = None
+
+# Largest input whose result still fits in a signed 64-bit integer
+FIBONACCI_INT64_MAX_N = 92
+
+# Largest n with n! <= 10**300, the practical limit on factorial results
+FACTORIAL_MAX_N = 166
+
+# Integer powers whose result would exceed this many bits are rejected
+POWER_MAX_RESULT_BITS = 1_000_000
+
+# Integer exponents above this run in a worker thread, off the event loop
+POWER_THREAD_MIN_EXPONENT = 100_000
+
+# Size of FibonacciOperation's direct-mapped result table
+FIBONACCI_CACHE_SLOTS = 512
+
+# Larger integer results skip the in-process cache, which is bounded by
+# entry count; this keeps it under ~32 MiB at the default 4096 entries
+HOT_CACHE_MAX_RESULT_BITS = 65_536
+
+
+def _fibonacci_table(max_n: int) -> tuple:
+    """F(0) .. F(max_n), built once at import."""
+    table = [0, 1]
+    while len(table) <= max_n:
+        table.append(table[-2] + table[-1])
+    return tuple(table[:max_n + 1])
+
+
+# Every Fibonacci number that fits in 64 bits; a tuple index beats any loop
+FIBONACCI_INT64 = _fibonacci_table(FIBONACCI_INT64_MAX_N)
+
+
+def _fibonacci_fast_doubling(n: int) -> int:
+    """
+    Fibonacci in O(log n) big-integer multiplications.
+
+    Walks the bits of n using F(2k) = F(k) * (2F(k+1) - F(k)) and
+    F(2k+1) = F(k)^2 + F(k+1)^2.
+    """
+    a, b = 0, 1  # F(k), F(k+1) for k = the bits of n consumed so far
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        if bit == "1":
+            a, b = d, c + d
+        else:
+            a, b = c, d
+    return a
+
+
+if xxhash is not None:
+    _key_digest = xxhash.xxh3_64_hexdigest
+else:
+    def _key_digest(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+# INSERT constructs with ON CONFLICT support, by dialect name; other
+# dialects fall back to an UPDATE followed, if nothing matched, by an INSERT
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+cache_table = CacheEntry.__table__
+
+# Cache lookup built once at import rather than on every call
+select_live_cache_entry = text(
+    "SELECT result, hit_count, expires_at FROM cache_entries "
+    "WHERE cache_key = :cache_key AND expires_at > :now"
+).columns(
+    cache_table.c.result, cache_table.c.hit_count, cache_table.c.expires_at
+)
+
+# Adds each key's pending hits to hit_count; run with one parameter set per key
+increment_hit_counts = (
+    update(cache_table)
+    .where(cache_table.c.cache_key == bindparam("key"))
+    .values(hit_count=cache_table.c.hit_count + bindparam("hits"))
+)
+
+
+def _fits_hot_cache(result: Any) -> bool:
+    return not isinstance(result, int) or result.bit_length() <= HOT_CACHE_MAX_RESULT_BITS
+
+
+def _pack_number(value: Union[int, float]) -> bytes:
+    """Encode a number for cache keys, keeping ints and floats distinct."""
+    if isinstance(value, float):
+        return b"f" + struct.pack("<d", value)
+    if -2**63 <= value < 2**63:
+        return b"i" + struct.pack("<q", value)
+    return b"n" + str(value).encode()
 
 
 class MathOperationBase(ABC, LoggerMixin):
 
+    # Operations are shared singletons with no per-instance attributes by
+    # default; subclasses declare the ones they need
+    __slots__ = ()
+
     @abstractmethod
-    async def execute(self, **kwargs) -> Union[int, float]:
+    def execute(self, *args) -> Union[int, float]:
         """Execute the mathematical operation."""
         pass
 
@@ -24,16 +132,30 @@ class MathOperationBase(ABC, LoggerMixin):
         """Get the name of the operation."""
         pass
 
-    def validate_input(self, **kwargs) -> bool:
+    @abstractmethod
+    def positional_args(self, parameters: dict) -> tuple:
+        """Request parameters as positional arguments for execute() and the hooks below."""
+        pass
+
+    def validate_input(self, *args) -> bool:
         """Validate input parameters. Override in subclasses if needed."""
         return True
 
+    def is_expensive(self, *args) -> bool:
+        """Whether these inputs should run in a worker thread. Override in subclasses if needed."""
+        return False
+
 
 class PowerOperation(MathOperationBase):
     """Power operation implementation."""
 
-    async def execute(self, base: Union[int, float], exponent: Union[int, float]) -> Union[int, float]:
+    __slots__ = ()
+
+    def execute(self, base: Union[int, float], exponent: Union[int, float]) -> Union[int, float]:
         """Calculate base^exponent."""
+        if not self.validate_input(base, exponent):
+            raise ValueError("Result too large to compute")
+
         try:
             result = pow(base, exponent)
             if isinstance(result, complex):
@@ -42,6 +164,20 @@ class PowerOperation(MathOperationBase):
         except OverflowError:
             raise ValueError("Result too large to compute")
 
+    def validate_input(self, base: Union[int, float], exponent: Union[int, float]) -> bool:
+        # Float powers overflow quickly on their own; an integer power is
+        # computed in full, so estimate its size before allocating it
+        if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+            return exponent * math.log2(abs(base)) <= POWER_MAX_RESULT_BITS
+        return True
+
+    def is_expensive(self, base: Union[int, float], exponent: Union[int, float]) -> bool:
+        # Float powers are a single libm call; only big-integer results take long
+        return isinstance(base, int) and isinstance(exponent, int) and exponent > POWER_THREAD_MIN_EXPONENT
+
+    def positional_args(self, parameters: dict) -> tuple:
+        return parameters["base"], parameters["exponent"]
+
     def get_operation_name(self) -> str:
         return "power"
 
@@ -49,31 +185,35 @@ class PowerOperation(MathOperationBase):
 class FibonacciOperation(MathOperationBase):
     """Fibonacci operation implementation with memoization."""
 
-    def __init__(self):
-        self._memo = {0: 0, 1: 1}
+    __slots__ = ("_cache",)
+
+    def __init__(self, cache_slots: int = FIBONACCI_CACHE_SLOTS):
+        # Direct-mapped (n, F(n)) table: memory stays bounded however large
+        # the requested n, at the cost of recomputing evicted values
+        self._cache = [None] * cache_slots
 
-    async def execute(self, n: int) -> int:
+    def execute(self, n: int) -> int:
         """Calculate the nth Fibonacci number."""
+        if n < 0:
+            # A negative index would silently read the table from the end
+            raise ValueError("Fibonacci is not defined for negative n")
+        if n <= FIBONACCI_INT64_MAX_N:
+            return FIBONACCI_INT64[n]
         return self._fibonacci_memo(n)
 
     def _fibonacci_memo(self, n: int) -> int:
-        """Memoized Fibonacci calculation."""
-        if n in self._memo:
-            return self._memo[n]
-
-        if n < 2:
-            return n
-
-        # Calculate iteratively to avoid stack overflow
-        a, b = 0, 1
-        for i in range(2, n + 1):
-            if i not in self._memo:
-                a, b = b, a + b
-                self._memo[i] = b
-            else:
-                a, b = self._memo[i-1], self._memo[i]
+        """Cached Fibonacci calculation for n > FIBONACCI_INT64_MAX_N."""
+        slot = n % len(self._cache)
+        entry = self._cache[slot]
+        if entry is not None and entry[0] == n:
+            return entry[1]
+
+        result = _fibonacci_fast_doubling(n)
+        self._cache[slot] = (n, result)
+        return result
 
-        return self._memo[n]
+    def positional_args(self, parameters: dict) -> tuple:
+        return (parameters["n"],)
 
     def get_operation_name(self) -> str:
         return "fibonacci"
@@ -82,60 +222,131 @@ class FibonacciOperation(MathOperationBase):
 class FactorialOperation(MathOperationBase):
     """Factorial operation implementation."""
 
-    async def execute(self, n: int) -> int:
+    __slots__ = ()
 
-        if n == 0 or n == 1:
-            return 1
+    def execute(self, n: int) -> int:
 
-        result = 1
-        for i in range(2, n + 1):
-            result *= i
-            # Check for reasonable limits to prevent excessive computation
-            if result > 10**300:  # Practical limit
-                raise ValueError("Factorial result too large")
+        # Check for reasonable limits before doing any big-integer work
+        if n > FACTORIAL_MAX_N:
+            raise ValueError("Factorial result too large")
 
-        return result
+        # math.factorial multiplies balanced halves of the range (binary
+        # splitting), so operands stay similar in size instead of one
+        # ever-growing bignum times a small int; small n come from a table
+        return math.factorial(n)
+
+    def positional_args(self, parameters: dict) -> tuple:
+        return (parameters["n"],)
 
     def get_operation_name(self) -> str:
         return "factorial"
 
 
-class CacheManager(LoggerMixin):
+def _generate_cache_key(operation: str, parameters: dict) -> str:
 
+    # Fixed-shape parameters are packed directly; others use the repr of
+    # their sorted items, which keeps ints and floats distinct
+    if operation == "power":
+        key_data = b"power:" + _pack_number(parameters["base"]) + _pack_number(parameters["exponent"])
+    elif operation in ("fibonacci", "factorial"):
+        key_data = operation.encode() + b":" + _pack_number(parameters["n"])
+    else:
+        key_data = f"{operation}:{tuple(sorted(parameters.items()))!r}".encode()
+    # Keys are not security sensitive, so a fast 64-bit hash is enough
+    return _key_digest(key_data)
 
-    def __init__(self, default_ttl_hours: int = 24):
-        self.default_ttl_hours = default_ttl_hours
 
-    def _generate_cache_key(self, operation: str, parameters: dict) -> str:
+class CacheCtx:
+    """
+    Cache lookup state for one request.
+
+    Built once by CacheManager.make_ctx and passed to get/set, so the keys
+    and the current time are derived once rather than at every step.
+    """
 
-        key_data = f"{operation}:{json.dumps(parameters, sort_keys=True)}"
-        return hashlib.sha256(key_data.encode()).hexdigest()
+    def __init__(self, operation: str, parameters: dict, hot_key: tuple, now: int):
+        self.operation = operation
+        self.parameters = parameters
+        self.hot_key = hot_key
+        self.now = now  # Unix seconds
 
-    async def get(self, db: AsyncSession, operation: str, parameters: dict) -> Optional[Any]:
+    @cached_property
+    def cache_key(self) -> str:
+        # Hashed only when the in-process cache misses
+        return _generate_cache_key(self.operation, self.parameters)
 
-        cache_key = self._generate_cache_key(operation, parameters)
+
+class CacheManager(LoggerMixin):
+
+
+    def __init__(
+        self,
+        default_ttl_hours: int = 24,
+        hot_cache_size: int = 4096,
+        hit_flush_size: int = 100,
+        hit_flush_interval: float = 5.0
+    ):
+        self.default_ttl_hours = default_ttl_hours
+        # Process-local (result, expires_at, cache_key) entries, checked
+        # before the database
+        self._hot = LRUCache(maxsize=hot_cache_size)
+        self.hit_flush_size = hit_flush_size
+        self.hit_flush_interval = hit_flush_interval
+        # Hits not yet added to hit_count, by cache key; written in batches
+        # so a cache hit never waits on an UPDATE and commit
+        self._pending_hits: Dict[str, int] = {}
+        self._last_hit_flush = time.monotonic()
+
+    @staticmethod
+    def _hot_cache_key(operation: str, parameters: dict) -> tuple:
+
+        # A plain tuple avoids hashing into a cache key on every lookup. Types
+        # are part of it because 2 and 2.0 compare equal but produce
+        # differently typed results
+        if operation == "power":
+            base, exponent = parameters["base"], parameters["exponent"]
+            return operation, base, exponent, type(base), type(exponent)
+        if operation in ("fibonacci", "factorial"):
+            return operation, parameters["n"]
+        return (operation,) + tuple(
+            (name, type(value), value) for name, value in sorted(parameters.items())
+        )
+
+    def make_ctx(self, operation: str, parameters: dict) -> CacheCtx:
+        """Build the cache state shared by get() and set() for one request."""
+        return CacheCtx(operation, parameters, self._hot_cache_key(operation, parameters), int(time.time()))
+
+    async def get(self, db: AsyncSession, ctx: CacheCtx) -> Optional[Any]:
+
+        hot_entry = self._hot.get(ctx.hot_key)
+        if hot_entry is not None and hot_entry[1] > ctx.now:
+            self._count_hit(hot_entry[2])
+            return hot_entry[0]
+
+        cache_key = ctx.cache_key
 
         try:
-            stmt = select(CacheEntry).where(
-                CacheEntry.cache_key == cache_key,
-                CacheEntry.expires_at > datetime.utcnow()
+            result = await db.execute(
+                select_live_cache_entry,
+                {"cache_key": cache_key, "now": ctx.now}
             )
-            result = await db.execute(stmt)
-            cache_entry = result.scalar_one_or_none()
+            cache_entry = result.one_or_none()
 
             if cache_entry:
-                # Update hit count
-                cache_entry.hit_count += 1
-                await db.commit()
+                self._count_hit(cache_key)
+                value = unpack(cache_entry.result)
+                if _fits_hot_cache(value):
+                    self._hot.set(ctx.hot_key, (value, cache_entry.expires_at, cache_key))
 
-                self.logger.info(
-                    "Cache hit",
-                    cache_key=cache_key,
-                    operation=operation,
-                    hit_count=cache_entry.hit_count
-                )
+                if self.logger.is_enabled_for(logging.INFO):
+                    self.logger.info(
+                        "Cache hit",
+                        cache_key=cache_key,
+                        operation=ctx.operation,
+                        hit_count=cache_entry.hit_count + self._pending_hits[cache_key]
+                    )
 
-                return json.loads(cache_entry.result)
+                return value
 
         except Exception as e:
             self.logger.error("Cache retrieval error", error=str(e))
@@ -145,50 +356,103 @@ class CacheManager(LoggerMixin):
     async def set(
         self,
         db: AsyncSession,
-        operation: str,
-        parameters: dict,
+        ctx: CacheCtx,
         result: Any,
         ttl_hours: Optional[int] = None
     ) -> None:
 
-        cache_key = self._generate_cache_key(operation, parameters)
-        ttl = ttl_hours or self.default_ttl_hours
-        expires_at = datetime.utcnow() + timedelta(hours=ttl)
+        # Only the database row is written here: the in-process entry is
+        # remember()'s job, and refreshing it from this background write would
+        # bump its recency or bring back an entry evicted in the meantime
+        expires_at = self._expires_at(ctx, ttl_hours)
+        cache_key = ctx.cache_key
 
         try:
-            # Check if entry already exists
-            stmt = select(CacheEntry).where(CacheEntry.cache_key == cache_key)
-            existing = await db.execute(stmt)
-            cache_entry = existing.scalar_one_or_none()
-
-            if cache_entry:
-                # Update existing entry
-                cache_entry.result = json.dumps(result)
-                cache_entry.expires_at = expires_at
-                cache_entry.parameters = json.dumps(parameters)  # Update parameters too
+            values = {
+                "operation": ctx.operation,
+                "parameters": pack(ctx.parameters),
+                "cache_key": cache_key,
+                "result": pack(result),
+                "expires_at": expires_at,
+            }
+
+            upsert_insert = _UPSERT_INSERTS.get(db.bind.dialect.name)
+            if upsert_insert is not None:
+                # Insert or refresh the entry in one statement
+                insert_stmt = upsert_insert(cache_table).values(**values)
+                await db.execute(insert_stmt.on_conflict_do_update(
+                    index_elements=[cache_table.c.cache_key],
+                    set_={
+                        "result": insert_stmt.excluded.result,
+                        "expires_at": insert_stmt.excluded.expires_at,
+                        "parameters": insert_stmt.excluded.parameters,  # Update parameters too
+                    }
+                ))
             else:
-                # Create new entry
-                cache_entry = CacheEntry(
-                    operation=operation,
-                    parameters=json.dumps(parameters),
+                updated = await db.execute(
+                    update(cache_table).where(cache_table.c.cache_key == cache_key).values(**values)
+                )
+                if updated.rowcount == 0:
+                    await db.execute(insert(cache_table).values(**values))
+            await db.commit()
+
+            if self.logger.is_enabled_for(logging.INFO):
+                self.logger.info(
+                    "Result cached",
+                    operation=ctx.operation,
+                    parameters=ctx.parameters,
                     cache_key=cache_key,
-                    result=json.dumps(result),
                     expires_at=expires_at
                 )
-                db.add(cache_entry)
 
-            await db.commit()
+        except Exception as e:
+            self.logger.error("Cache storage error", error=str(e))
+            await db.rollback()
 
-            self.logger.info(
-                "Result cached",
-                operation=operation,
-                parameters=parameters,
-                cache_key=cache_key,
-                expires_at=expires_at.isoformat()
+    def _expires_at(self, ctx: CacheCtx, ttl_hours: Optional[int]) -> int:
+        return ctx.now + (ttl_hours or self.default_ttl_hours) * 3600
+
+    def remember(self, ctx: CacheCtx, result: Any, ttl_hours: Optional[int] = None) -> int:
+        """Store a result in the in-process cache only (if small enough); returns its expiry."""
+        expires_at = self._expires_at(ctx, ttl_hours)
+        if _fits_hot_cache(result):
+            self._hot.set(ctx.hot_key, (result, expires_at, ctx.cache_key))
+        return expires_at
+
+    def _count_hit(self, cache_key: str) -> None:
+        self._pending_hits[cache_key] = self._pending_hits.get(cache_key, 0) + 1
+
+    def hit_flush_due(self) -> bool:
+        """
+        Whether enough hits or time have accumulated to write them out.
+
+        This is only checked when a hit is served, so counts are written on
+        the first hit after hit_flush_size keys or hit_flush_interval seconds
+        have accumulated (and at shutdown), not on a timer.
+        """
+        if not self._pending_hits:
+            return False
+        return (
+            len(self._pending_hits) >= self.hit_flush_size
+            or time.monotonic() - self._last_hit_flush >= self.hit_flush_interval
+        )
+
+    async def flush_hit_counts(self, db: AsyncSession) -> None:
+        """Add the pending hits to hit_count in a single batched UPDATE."""
+        pending, self._pending_hits = self._pending_hits, {}
+        self._last_hit_flush = time.monotonic()
+        if not pending:
+            return
+
+        try:
+            await db.execute(
+                increment_hit_counts,
+                [{"key": cache_key, "hits": hits} for cache_key, hits in pending.items()]
             )
+            await db.commit()
 
         except Exception as e:
-            self.logger.error("Cache storage error", error=str(e))
+            self.logger.error("Cache hit count flush error", error=str(e), entries=len(pending))
             await db.rollback()
 
 
@@ -202,6 +466,8 @@ class MathService(LoggerMixin):
             "factorial": FactorialOperation()
         }
         self.cache_manager = CacheManager()
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._hit_flush_task: Optional[asyncio.Task] = None
 
     def register_operation(self, operation: MathOperationBase) -> None:
 
@@ -223,22 +489,31 @@ class MathService(LoggerMixin):
         operation = self.operations[operation_name]
 
         # Check cache first
-        cached_result = None
         if use_cache:
-            cached_result = await self.cache_manager.get(db, operation_name, parameters)
+            cache_ctx = self.cache_manager.make_ctx(operation_name, parameters)
+            cached_result = await self.cache_manager.get(db, cache_ctx)
             if cached_result is not None:
+                self._schedule_hit_flush()
                 return cached_result, 0.0, True
 
         # Execute operation
         start_time = time.perf_counter()
 
         try:
-            result = await operation.execute(**parameters)
+            # CPU-bound: run inline unless the inputs are large enough that
+            # blocking the event loop would stall other requests
+            args = operation.positional_args(parameters)
+            if operation.is_expensive(*args):
+                result = await asyncio.to_thread(operation.execute, *args)
+            else:
+                result = operation.execute(*args)
             execution_time = (time.perf_counter() - start_time) * 1000  # Convert to ms
 
-            # Cache the result
+            # Cache the result; the database write does not block the response
             if use_cache and result is not None:
-                await self.cache_manager.set(db, operation_name, parameters, result)
+                # Serve repeats from memory right away, before the write runs
+                self.cache_manager.remember(cache_ctx, result)
+                self._run_in_background(self._store_in_cache(cache_ctx, result))
 
             return result, execution_time, False
 
@@ -253,6 +528,38 @@ class MathService(LoggerMixin):
             )
             raise ValueError(f"Operation failed: {str(e)}")
 
+    async def _store_in_cache(self, cache_ctx: CacheCtx, result: Any) -> None:
+
+        # The request-scoped session may already be closed when this runs
+        async with AsyncSessionLocal() as db:
+            await self.cache_manager.set(db, cache_ctx, result)
+
+    async def _flush_hit_counts(self) -> None:
+
+        async with AsyncSessionLocal() as db:
+            await self.cache_manager.flush_hit_counts(db)
+
+    def _schedule_hit_flush(self) -> None:
+
+        # Called on cache hits only; at most one flush in flight, and hits
+        # counted meanwhile go in the next one
+        if self.cache_manager.hit_flush_due() and (self._hit_flush_task is None or self._hit_flush_task.done()):
+            self._hit_flush_task = self._run_in_background(self._flush_hit_counts())
+
+    def _run_in_background(self, coro: Coroutine) -> asyncio.Task:
+
+        task = asyncio.create_task(coro)
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def wait_for_background_tasks(self) -> None:
+        """Wait for pending cache writes, e.g. before closing the database."""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self._flush_hit_counts()
+
     def get_available_operations(self) -> list[str]:
 
         return list(self.operations.keys())
\ No newline at end of file
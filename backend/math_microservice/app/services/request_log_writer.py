@@ -0,0 +1,74 @@
+import asyncio
+from contextlib import suppress
+from typing import List, Optional
+
+from sqlalchemy import insert
+
+from ..db.database import AsyncSessionLocal
+from ..models.request_model import MathRequest
+from ..utils.logger import LoggerMixin
+
+
+class RequestLogWriter(LoggerMixin):
+    """
+    Persists request logs in batches from a background task.
+
+    Handlers enqueue rows that are ready to insert (parameters and result
+    already packed to MessagePack) and return immediately; the drainer
+    inserts whatever has accumulated in a single statement and commit.
+    """
+
+    def __init__(self, max_queue_size: int = 10000, max_batch_size: int = 500):
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the background drainer. Must be called from a running event loop."""
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._drain())
+
+    async def stop(self) -> None:
+        """Flush queued rows and stop the drainer."""
+        if self._task is None:
+            return
+
+        await self._queue.join()
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+
+        self._task = None
+        self._queue = None
+
+    async def enqueue(self, row: dict) -> None:
+        """Queue a request log row for persistence."""
+        if self._queue is None:
+            # Not started (e.g. no lifespan): write through
+            await self._write([row])
+            return
+
+        await self._queue.put(row)
+
+    async def _drain(self) -> None:
+
+        while True:
+            rows = [await self._queue.get()]
+            while len(rows) < self.max_batch_size and not self._queue.empty():
+                rows.append(self._queue.get_nowait())
+
+            try:
+                await self._write(rows)
+            except Exception as e:
+                self.logger.error("Failed to persist request batch", error=str(e), batch_size=len(rows))
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    async def _write(self, rows: List[dict]) -> None:
+
+        # Core insert on the table: one executemany, no ORM unit of work
+        async with AsyncSessionLocal() as session:
+            await session.execute(insert(MathRequest.__table__), rows)
+            await session.commit()
@@ -39,28 +39,42 @@ def configure_logging() -> None:
     )
 
 
-def get_logger(name: str) -> structlog.stdlib.BoundLogger:
+def get_logger(name: str, **initial_values: Any) -> structlog.stdlib.BoundLogger:
     """
     Get a structured logger instance.
 
+    The logger is bound lazily on first use and then cached, so it is safe
+    to create at import time, before configure_logging() runs.
+
     Args:
         name: Logger name (usually __name__)
+        **initial_values: Fields bound to every event of this logger
 
     Returns:
         BoundLogger: Configured logger instance
     """
-    return structlog.get_logger(name)
+    return structlog.get_logger(name, **initial_values)
+
+
+# Shared by log_request_info instead of creating a logger per call
+request_logger = get_logger("request")
 
 
 class LoggerMixin:
     """
     Mixin class to add logging capability to other classes.
+
+    Each subclass gets its own ``logger`` class attribute when it is
+    defined, so ``self.logger`` is a plain attribute lookup.
     """
 
-    @property
-    def logger(self) -> structlog.stdlib.BoundLogger:
-        """Get logger for this class."""
-        return get_logger(self.__class__.__name__)
+    __slots__ = ()
+
+    logger: structlog.stdlib.BoundLogger
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.logger = get_logger(cls.__name__)
 
 
 def log_request_info(
@@ -84,7 +98,9 @@ def log_request_info(
         error: Error message if unsuccessful
         client_ip: Client IP address
     """
-    logger = get_logger("request")
+    # Skip building the event (and inspecting the result) when it would be dropped
+    if not request_logger.is_enabled_for(logging.ERROR if error else logging.INFO):
+        return
 
     log_data = {
         "operation": operation,
@@ -101,6 +117,6 @@ def log_request_info(
 
     if error:
         log_data["error"] = error
-        logger.error("Math operation failed", **log_data)
+        request_logger.error("Math operation failed", **log_data)
     else:
-        logger.info("Math operation completed", **log_data)
\ No newline at end of file
+        request_logger.info("Math operation completed", **log_data)
\ No newline at end of file
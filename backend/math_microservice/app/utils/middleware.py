@@ -0,0 +1,71 @@
+import logging
+from datetime import datetime
+from time import perf_counter_ns
+from typing import FrozenSet
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RequestLoggingMiddleware:
+    """
+    Time and log every HTTP request and add an X-Process-Time header.
+
+    Written as plain ASGI middleware: unlike ``@app.middleware("http")``
+    (BaseHTTPMiddleware) it does not spawn a task and memory stream per
+    request.
+    """
+
+    def __init__(self, app: ASGIApp, unlogged_paths: FrozenSet[str] = frozenset()):
+        self.app = app
+        self.unlogged_paths = unlogged_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = perf_counter_ns()
+        status_code = 500
+
+        async def send_with_process_time(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", f"{(perf_counter_ns() - start_time) / 1e9:.6f}")
+            await send(message)
+
+        # Skip building the log events when INFO is filtered out anyway
+        if scope["path"] in self.unlogged_paths or not logger.is_enabled_for(logging.INFO):
+            await self.app(scope, receive, send_with_process_time)
+            return
+
+        request = Request(scope)
+        url = str(request.url)
+
+        # Log request
+        logger.info(
+            "Incoming request",
+            method=request.method,
+            url=url,
+            client_ip=request.client.host if request.client else "unknown",
+            user_agent=request.headers.get("User-Agent", ""),
+            timestamp=datetime.utcnow().isoformat()
+        )
+
+        await self.app(scope, receive, send_with_process_time)
+
+        # Log response
+        logger.info(
+            "Request completed",
+            method=request.method,
+            url=url,
+            status_code=status_code,
+            duration_ms=round((perf_counter_ns() - start_time) / 1e6, 2)
+        )
@@ -0,0 +1,139 @@
+import json
+import re
+import time
+from typing import Any, Callable, Union
+
+import ormsgpack
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+# Python floats never repr with more than 17 consecutive digits, so a run of
+# 19+ digits can only be an integer that may not fit in 64 bits.
+_BIG_INT_PATTERN = re.compile(r"\d{19}")
+_BIG_INT_PATTERN_BYTES = re.compile(rb"\d{19}")
+
+# MessagePack integers are limited to 64 bits; larger ones are stored as an
+# extension type holding their little-endian two's-complement bytes. Type 1
+# (decimal text) is what older rows used and is still read.
+_BIG_INT_DECIMAL_EXT_TYPE = 1
+_BIG_INT_EXT_TYPE = 2
+
+
+def _is_big_int(obj: Any) -> bool:
+    return type(obj) is int and not -2**63 <= obj < 2**64
+
+
+def _big_int_ext(value: int) -> "ormsgpack.Ext":
+    # Unlike str(), to_bytes is linear in the size of the integer
+    return ormsgpack.Ext(_BIG_INT_EXT_TYPE, value.to_bytes(value.bit_length() // 8 + 1, "little", signed=True))
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Deserialize a JSON string or bytes.
+
+    orjson parses integers beyond 64 bits as floats, so documents that may
+    contain one are decoded with the standard library to keep them exact.
+    """
+    if orjson is not None:
+        pattern = _BIG_INT_PATTERN_BYTES if isinstance(data, bytes) else _BIG_INT_PATTERN
+        if pattern.search(data) is None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+    return json.loads(data)
+
+
+def _wrap_big_ints(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {key: _wrap_big_ints(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_wrap_big_ints(value) for value in obj]
+    if _is_big_int(obj):
+        return _big_int_ext(obj)
+    return obj
+
+
+def _unwrap_ext(tag: int, data: bytes) -> Any:
+    if tag == _BIG_INT_EXT_TYPE:
+        return int.from_bytes(data, "little", signed=True)
+    if tag == _BIG_INT_DECIMAL_EXT_TYPE:
+        return int(data)
+    raise ValueError(f"Unknown MessagePack extension type: {tag}")
+
+
+def pack(obj: Any) -> bytes:
+    """
+    Serialize an object to MessagePack for storage in binary columns.
+
+    Integers beyond 64 bits are kept exact via an extension type.
+    """
+    # Large Fibonacci and factorial results are bare big integers; wrap them
+    # directly rather than through a failed encode and a rewalk
+    if _is_big_int(obj):
+        return ormsgpack.packb(_big_int_ext(obj))
+    try:
+        return ormsgpack.packb(obj)
+    except ormsgpack.MsgpackEncodeError:
+        return ormsgpack.packb(_wrap_big_ints(obj))
+
+
+def unpack(data: Union[str, bytes]) -> Any:
+    """
+    Deserialize a value written by ``pack``.
+
+    Rows written before the switch to MessagePack hold JSON text and are
+    decoded as such.
+    """
+    if isinstance(data, str):
+        return loads(data)
+    return ormsgpack.unpackb(data, ext_hook=_unwrap_ext)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Unlike FastAPI's ORJSONResponse it keeps working for integers beyond
+    64 bits and when orjson is not installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
+
+
+class CachedJSONBody:
+    """
+    Pre-rendered JSON body that is rebuilt at most once per ``ttl`` seconds.
+
+    Meant for cheap, mostly static endpoints such as health probes; the
+    builder must return JSON-native values (format datetimes itself).
+    """
+
+    def __init__(self, build: Callable[[], Any], ttl: float = 1.0):
+        self._build = build
+        self.ttl = ttl
+        self._body = b""
+        self._expires_at = 0.0
+
+    def get(self) -> bytes:
+        now = time.monotonic()
+        if now >= self._expires_at:
+            self._body = dumps_bytes(self._build())
+            self._expires_at = now + self.ttl
+        return self._body
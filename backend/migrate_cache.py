@@ -1,10 +1,22 @@
 
-import asyncio
 import sqlite3
 from pathlib import Path
 
+from math_microservice.app.db.database import CONVERT_LEGACY_EXPIRES_AT, SQLITE_PRAGMAS
+from math_microservice.app.utils.serialization import loads, pack
 
-async def migrate_cache_table():
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open the database with the same pragmas the service uses."""
+    conn = sqlite3.connect(str(db_path))
+    # journal_mode=WAL is stored in the file, so it also carries over to the
+    # service; the rest apply to this connection only
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def migrate_cache_table():
     """
     Add operation and parameters columns to existing cache_entries table.
     """
@@ -18,7 +30,7 @@ async def migrate_cache_table():
 
     try:
         # Connect to SQLite database
-        conn = sqlite3.connect(str(db_path))
+        conn = connect(db_path)
         cursor = conn.cursor()
 
         # Check if columns already exist
@@ -32,6 +44,10 @@ async def migrate_cache_table():
 
         print("📝 Adding new columns...")
 
+        # sqlite3 does not open transactions for DDL on its own; without this
+        # every statement below would commit (and sync) separately
+        cursor.execute("BEGIN")
+
         # Add operation column
         if 'operation' not in columns:
             cursor.execute("""
@@ -86,6 +102,86 @@ async def migrate_cache_table():
         raise
 
 
+def migrate_payload_columns():
+    """
+    Re-encode JSON text parameters/result values as MessagePack blobs.
+    """
+    db_path = Path("math_service.db")
+
+    if not db_path.exists():
+        print("❌ Database file not found. No migration needed.")
+        return
+
+    print("🔄 Converting stored parameters and results to MessagePack...")
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        for table in ("math_requests", "cache_entries"):
+            cursor.execute(f"""
+                SELECT id, parameters, result FROM {table}
+                WHERE typeof(parameters) = 'text' OR typeof(result) = 'text'
+            """)
+            rows = [
+                (
+                    pack(loads(parameters)) if isinstance(parameters, str) else parameters,
+                    pack(loads(result)) if isinstance(result, str) else result,
+                    row_id
+                )
+                for row_id, parameters, result in cursor.fetchall()
+            ]
+
+            cursor.executemany(
+                f"UPDATE {table} SET parameters = ?, result = ? WHERE id = ?",
+                rows
+            )
+            print(f"   ✅ Converted {len(rows)} rows in '{table}'")
+
+        conn.commit()
+        conn.close()
+
+        print("✅ Payload conversion completed successfully!")
+
+    except sqlite3.Error as e:
+        print(f"❌ Payload conversion failed: {e}")
+        if 'conn' in locals():
+            conn.close()
+        raise
+
+
+def migrate_expires_at():
+    """
+    Convert cache_entries.expires_at from datetime text to Unix seconds.
+    """
+    db_path = Path("math_service.db")
+
+    if not db_path.exists():
+        print("❌ Database file not found. No migration needed.")
+        return
+
+    print("🔄 Converting cache expiry times to Unix timestamps...")
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        # The service also runs this at startup
+        cursor.execute(CONVERT_LEGACY_EXPIRES_AT)
+        print(f"   ✅ Converted {cursor.rowcount} rows in 'cache_entries'")
+
+        conn.commit()
+        conn.close()
+
+        print("✅ Expiry conversion completed successfully!")
+
+    except sqlite3.Error as e:
+        print(f"❌ Expiry conversion failed: {e}")
+        if 'conn' in locals():
+            conn.close()
+        raise
+
+
 def main():
     """Run the migration."""
     print("=" * 60)
@@ -93,7 +189,9 @@ def main():
     print("=" * 60)
 
     try:
-        asyncio.run(migrate_cache_table())
+        migrate_cache_table()
+        migrate_payload_columns()
+        migrate_expires_at()
     except KeyboardInterrupt:
         print("\n⚠️  Migration cancelled by user")
     except Exception as e:
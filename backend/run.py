@@ -4,7 +4,9 @@ Production entry point for the Math Microservice.
 Run from project root directory.
 """
 
+import asyncio
 import os
+import platform
 import sys
 import uvicorn
 from pathlib import Path
@@ -14,6 +16,8 @@ project_root = Path(__file__).parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+from math_microservice.app.db.database import close_db, init_db
+from math_microservice.app.models import request_model  # noqa: F401  registers the tables
 from math_microservice.app.utils.logger import configure_logging, get_logger
 
 # Configure logging early
@@ -28,7 +32,10 @@ def main():
     # Environment configuration
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8000))
-    workers = int(os.getenv("WORKERS", 1))
+    # The operations are CPU-bound, so scale with processes: one per core.
+    # Workers accept from the socket bound by the parent process, so the
+    # kernel already spreads connections across them
+    workers = int(os.getenv("WORKERS", os.cpu_count() or 1))
     log_level = os.getenv("LOG_LEVEL", "info").lower()
     reload = os.getenv("RELOAD", "false").lower() == "true"
 
@@ -41,6 +48,11 @@ def main():
         reload=reload
     )
 
+    # uvloop and httptools (installed with uvicorn[standard]) are C
+    # implementations of the event loop and HTTP parser; uvloop does not
+    # support Windows, so stay on the pure-Python stack there
+    on_windows = platform.system() == "Windows"
+
     # Production configuration
     config = {
         "app": "math_microservice.app.main:app",
@@ -48,8 +60,8 @@ def main():
         "port": port,
         "log_level": log_level,
         "access_log": True,
-        "loop": "asyncio",
-        "http": "h11",
+        "loop": "asyncio" if on_windows else "uvloop",
+        "http": "h11" if on_windows else "httptools",
     }
 
     # Add reload only in development
@@ -63,11 +75,26 @@ def main():
         config.update({
             "workers": workers,
             "backlog": 2048,
-            "max_requests": 1000,
-            "max_requests_jitter": 100,
         })
 
+        # Opt-in: uvicorn exits after this many requests and only a
+        # supervisor (or the multi-worker manager) starts it again, which
+        # also discards the in-process caches
+        max_requests = os.getenv("LIMIT_MAX_REQUESTS")
+        if max_requests:
+            config["limit_max_requests"] = int(max_requests)
+
+    async def prepare_schema():
+        try:
+            await init_db()
+        finally:
+            await close_db()
+
     try:
+        # Set the schema up once here, before any worker starts; each worker's
+        # lifespan then finds it in place (init_db is idempotent and safe to
+        # run concurrently either way)
+        asyncio.run(prepare_schema())
         uvicorn.run(**config)
     except KeyboardInterrupt:
         logger.info("Shutting down Math Microservice")
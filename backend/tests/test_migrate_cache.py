@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+import migrate_cache
+from math_microservice.app.utils.serialization import unpack
+
+FIB_100 = 354224848179261915075
+
+
+@pytest.fixture
+def legacy_db(tmp_path, monkeypatch):
+    """A database in the pre-MessagePack layout, in the working directory."""
+    monkeypatch.chdir(tmp_path)
+    conn = sqlite3.connect("math_service.db")
+    conn.executescript(f"""
+        CREATE TABLE math_requests (
+            id INTEGER PRIMARY KEY, operation VARCHAR(50), parameters TEXT, result TEXT
+        );
+        CREATE TABLE cache_entries (
+            id INTEGER PRIMARY KEY, operation VARCHAR(50), parameters TEXT,
+            cache_key VARCHAR(255), result TEXT, created_at DATETIME,
+            expires_at DATETIME, hit_count INTEGER
+        );
+        INSERT INTO math_requests VALUES (1, 'fibonacci', '{{"n": 100}}', '{FIB_100}');
+        INSERT INTO math_requests VALUES (2, 'factorial', '{{"n": 170}}', NULL);
+        INSERT INTO cache_entries VALUES (
+            1, 'power', '{{"base": 2.0, "exponent": 10}}', 'k1', '1024.0',
+            '2024-01-01 00:00:00', '2024-01-02 00:00:00.000000', 3
+        );
+        INSERT INTO cache_entries VALUES (
+            2, 'fibonacci', '{{"n": 100}}', 'k2', '{FIB_100}',
+            '2024-01-01 00:00:00', NULL, 0
+        );
+    """)
+    conn.commit()
+    conn.close()
+    return tmp_path / "math_service.db"
+
+
+def test_migrate_payload_columns(legacy_db):
+    migrate_cache.migrate_payload_columns()
+
+    conn = sqlite3.connect(legacy_db)
+    requests = conn.execute("SELECT parameters, result FROM math_requests ORDER BY id").fetchall()
+    entries = conn.execute("SELECT parameters, result FROM cache_entries ORDER BY id").fetchall()
+    conn.close()
+
+    assert [(unpack(p), r if r is None else unpack(r)) for p, r in requests] == [
+        ({"n": 100}, FIB_100),
+        ({"n": 170}, None),
+    ]
+    assert [(unpack(p), unpack(r)) for p, r in entries] == [
+        ({"base": 2.0, "exponent": 10}, 1024.0),
+        ({"n": 100}, FIB_100),
+    ]
+    assert all(isinstance(p, bytes) for p, _ in requests + entries)
+
+    # Already converted rows are left alone on a second run
+    migrate_cache.migrate_payload_columns()
+    conn = sqlite3.connect(legacy_db)
+    assert conn.execute("SELECT parameters, result FROM cache_entries ORDER BY id").fetchall() == entries
+    conn.close()
+
+
+def test_migrate_expires_at(legacy_db):
+    migrate_cache.migrate_expires_at()
+
+    conn = sqlite3.connect(legacy_db)
+    rows = conn.execute(
+        "SELECT expires_at, typeof(expires_at) FROM cache_entries ORDER BY id"
+    ).fetchall()
+    conn.close()
+
+    # 2024-01-02 00:00:00 UTC
+    assert rows == [(1704153600, "integer"), (None, "null")]
+
+
+def test_migrations_skip_missing_database(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    migrate_cache.migrate_payload_columns()
+    migrate_cache.migrate_expires_at()
+    assert not (tmp_path / "math_service.db").exists()
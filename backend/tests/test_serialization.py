@@ -0,0 +1,57 @@
+import ormsgpack
+import pytest
+
+from math_microservice.app.utils.serialization import pack, unpack
+
+
+@pytest.mark.parametrize("value", [
+    0,
+    -1,
+    2**63 - 1,
+    2**63,
+    -2**63,
+    -2**63 - 1,
+    2**64 - 1,
+    2**64,
+    -2**64,
+    3**900,
+    -(3**900),
+])
+def test_int_round_trip(value):
+    decoded = unpack(pack(value))
+    assert decoded == value
+    assert type(decoded) is int
+
+
+def test_big_ints_nested_in_dicts_round_trip():
+    value = {
+        "n": 100,
+        "result": 354224848179261915075,
+        "nested": {"values": [2**64, -2**64 - 1, 1.5, None, "text"]},
+    }
+    assert unpack(pack(value)) == value
+
+
+def test_floats_and_ints_stay_distinct():
+    assert type(unpack(pack(1024.0))) is float
+    assert type(unpack(pack(1024))) is int
+
+
+def test_unpack_reads_decimal_big_int_extension():
+    # Big integers used to be stored as decimal text in extension type 1
+    legacy = ormsgpack.packb(ormsgpack.Ext(1, str(3**300).encode()))
+    assert unpack(legacy) == 3**300
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"n": 100}', {"n": 100}),
+    ('{"base": 2.0, "exponent": 10}', {"base": 2.0, "exponent": 10}),
+    ("1024", 1024),
+    ("354224848179261915075", 354224848179261915075),
+    ('{"result": 43466557686937456435688527675040625802564660517371780402481729089536555417949051890403879840079255169295922593080322634775209689623239873322471161642996440906533187938298969649928516003704476137795166849228875}',
+     {"result": 43466557686937456435688527675040625802564660517371780402481729089536555417949051890403879840079255169295922593080322634775209689623239873322471161642996440906533187938298969649928516003704476137795166849228875}),
+])
+def test_unpack_reads_legacy_json_text(text, expected):
+    decoded = unpack(text)
+    assert decoded == expected
+    assert type(decoded) is type(expected)